@@ -5,7 +5,7 @@ import json
 from tax_engine import TaxEngine
 from compliance_engine import ComplianceEngine, FormGenerator
 from compliance_validator import ComplianceValidator
-from service_classifier import ServiceClassifier
+from service_classifier import get_classifier
 from integration.erp_connector import ERPConnector
 from integration.payment_gateway import PaymentGatewayConnector
 from integration.document_manager import DocumentManager
@@ -16,7 +16,7 @@ class AutomationOrchestrator:
         self.compliance_engine = ComplianceEngine()
         self.form_generator = FormGenerator()
         self.compliance_validator = ComplianceValidator()
-        self.service_classifier = ServiceClassifier()
+        self.service_classifier = get_classifier()
         
     async def process_transaction(self, transaction_data: dict) -> dict:
         """Process a transaction through the entire compliance workflow"""
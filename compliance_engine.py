@@ -4,6 +4,7 @@ from enum import Enum
 from typing import List, Dict, Optional, Any
 import json
 import calendar
+from types import MappingProxyType
 
 class ComplianceStatus(Enum):
     PENDING = "Pending"
@@ -12,7 +13,7 @@ class ComplianceStatus(Enum):
     ESCALATED = "Escalated"
     OVERDUE = "Overdue"
 
-@dataclass
+@dataclass(frozen=True)
 class ComplianceDocument:
     name: str
     type: str
@@ -31,90 +32,108 @@ class ComplianceAction:
     assignee: str
     notes: str
 
-class ComplianceEngine:
-    def __init__(self):
-        self.required_documents = {
-            "INDIA": {
-                "15CA": [
-                    ComplianceDocument(
-                        name="Invoice",
-                        type="Transaction",
-                        required=True,
-                        description="Original invoice from vendor",
-                        retention_period=96
-                    ),
-                    ComplianceDocument(
-                        name="Tax Residency Certificate",
-                        type="Tax",
-                        required=True,
-                        description="Valid for current financial year",
-                        retention_period=96
-                    ),
-                    ComplianceDocument(
-                        name="Service Agreement",
-                        type="Contract",
-                        required=True,
-                        description="Master service agreement or SOW",
-                        retention_period=96
-                    )
-                ]
-            },
-            "USA": {
-                "1042-S": [
-                    ComplianceDocument(
-                        name="W-8BEN/W-8BEN-E",
-                        type="Tax",
-                        required=True,
-                        description="Valid for 3 years from signing",
-                        retention_period=84
-                    ),
-                    ComplianceDocument(
-                        name="Invoice",
-                        type="Transaction",
-                        required=True,
-                        description="Original invoice with tax breakdown",
-                        retention_period=84
-                    )
-                ]
-            },
-            "EU": {
-                "VAT": [
-                    ComplianceDocument(
-                        name="VAT Invoice",
-                        type="Transaction",
-                        required=True,
-                        description="Invoice with VAT registration numbers",
-                        retention_period=120
-                    ),
-                    ComplianceDocument(
-                        name="Proof of Service",
-                        type="Transaction",
-                        required=True,
-                        description="Evidence of B2B service provision",
-                        retention_period=120
-                    )
-                ]
-            }
+def _read_only(table):
+    """Recursively freeze a rule table: dicts become mapping proxies, lists become tuples"""
+    if isinstance(table, dict):
+        return MappingProxyType({key: _read_only(value) for key, value in table.items()})
+    if isinstance(table, list):
+        return tuple(_read_only(item) for item in table)
+    return table
+
+# Documents to keep per jurisdiction and form
+_REQUIRED_DOCUMENTS = _read_only({
+    "INDIA": {
+        "15CA": [
+            ComplianceDocument(
+                name="Invoice",
+                type="Transaction",
+                required=True,
+                description="Original invoice from vendor",
+                retention_period=96
+            ),
+            ComplianceDocument(
+                name="Tax Residency Certificate",
+                type="Tax",
+                required=True,
+                description="Valid for current financial year",
+                retention_period=96
+            ),
+            ComplianceDocument(
+                name="Service Agreement",
+                type="Contract",
+                required=True,
+                description="Master service agreement or SOW",
+                retention_period=96
+            )
+        ]
+    },
+    "USA": {
+        "1042-S": [
+            ComplianceDocument(
+                name="W-8BEN/W-8BEN-E",
+                type="Tax",
+                required=True,
+                description="Valid for 3 years from signing",
+                retention_period=84
+            ),
+            ComplianceDocument(
+                name="Invoice",
+                type="Transaction",
+                required=True,
+                description="Original invoice with tax breakdown",
+                retention_period=84
+            )
+        ]
+    },
+    "EU": {
+        "VAT": [
+            ComplianceDocument(
+                name="VAT Invoice",
+                type="Transaction",
+                required=True,
+                description="Invoice with VAT registration numbers",
+                retention_period=120
+            ),
+            ComplianceDocument(
+                name="Proof of Service",
+                type="Transaction",
+                required=True,
+                description="Evidence of B2B service provision",
+                retention_period=120
+            )
+        ]
+    }
+})
+
+# Filing deadlines per tax type and country
+_FILING_DEADLINES = _read_only({
+    "GST": {
+        "India": {
+            "monthly": 20,  # Due by 20th of next month
+            "quarterly": {"month": 4, "day": 30}  # For quarterly returns
+        },
+        "Singapore": {
+            "quarterly": {"month": 1, "day": 31}  # Due by Jan 31 for Q4
         }
-        self.filing_deadlines = {
-            "GST": {
-                "India": {
-                    "monthly": 20,  # Due by 20th of next month
-                    "quarterly": {"month": 4, "day": 30}  # For quarterly returns
-                },
-                "Singapore": {
-                    "quarterly": {"month": 1, "day": 31}  # Due by Jan 31 for Q4
-                }
-            },
-            "WHT": {
-                "India": {
-                    "monthly": 7  # Due by 7th of next month
-                },
-                "Singapore": {
-                    "monthly": 15  # Due by 15th of next month
-                }
-            }
+    },
+    "WHT": {
+        "India": {
+            "monthly": 7  # Due by 7th of next month
+        },
+        "Singapore": {
+            "monthly": 15  # Due by 15th of next month
         }
+    }
+})
+
+# Requirements validate_requirements checks, in reporting order
+_REQUIRED_FIELDS = ("tax_registration", "valid_tax_id", "filing_history")
+
+class ComplianceEngine:
+    def __init__(self):
+        # Rule tables are module-level and read-only, so every engine shares them
+        self.required_documents = _REQUIRED_DOCUMENTS
+        self.filing_deadlines = _FILING_DEADLINES
 
     def generate_compliance_checklist(self, tax_advice: dict, transaction_date: datetime) -> List[ComplianceAction]:
         """Generate compliance checklist based on tax advice"""
@@ -135,7 +154,7 @@ class ComplianceEngine:
                     form_number="15CA",
                     jurisdiction="INDIA",
                     due_date=transaction_date + timedelta(days=7),
-                    required_documents=self.required_documents["INDIA"]["15CA"],
+                    required_documents=list(self.required_documents["INDIA"]["15CA"]),
                     status=ComplianceStatus.PENDING,
                     risk_level="Medium",
                     assignee="Tax Team",
@@ -160,7 +179,7 @@ class ComplianceEngine:
                     form_number="1042-S",
                     jurisdiction="USA",
                     due_date=datetime(transaction_date.year + 1, 3, 15),
-                    required_documents=self.required_documents["USA"]["1042-S"],
+                    required_documents=list(self.required_documents["USA"]["1042-S"]),
                     status=ComplianceStatus.PENDING,
                     risk_level="High",
                     assignee="Tax Team",
@@ -172,7 +191,7 @@ class ComplianceEngine:
                 form_number="VAT Return",
                 jurisdiction="EU",
                 due_date=month_end + timedelta(days=20),
-                required_documents=self.required_documents["EU"]["VAT"],
+                required_documents=list(self.required_documents["EU"]["VAT"]),
                 status=ComplianceStatus.PENDING,
                 risk_level="Medium",
                 assignee="Tax Team",
@@ -264,13 +283,7 @@ class ComplianceEngine:
         return transaction_date + deadline
 
     def validate_requirements(self, requirements: Dict[str, Any]) -> Dict[str, Any]:
-        missing = []
-        if not requirements.get("tax_registration"):
-            missing.append("tax_registration")
-        if not requirements.get("valid_tax_id"):
-            missing.append("valid_tax_id")
-        if not requirements.get("filing_history"):
-            missing.append("filing_history")
+        missing = [field for field in _REQUIRED_FIELDS if not requirements.get(field)]
 
         return {
             "is_compliant": len(missing) == 0,
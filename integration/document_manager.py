@@ -4,6 +4,7 @@ from typing import List, Dict, Optional, Any
 import aiohttp
 from abc import ABC, abstractmethod
 from enum import Enum
+from .sessions import client_session
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
@@ -31,8 +32,10 @@ class DocumentType(Enum):
     CONTRACT = "contract"
 
 class DocumentManager(ABC):
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, *, session: Optional[aiohttp.ClientSession] = None):
         self.api_key = api_key or "mock_api_key"
+        # Shared session to reuse pooled connections; each request opens its own when None
+        self.session = session
         self.required_documents = {
             "invoice": ["pdf", "xml"],
             "tax_certificate": ["pdf"],
@@ -100,15 +103,16 @@ class GoogleDriveManager(DocumentManager):
         """Fetch documents from Google Drive"""
         query = self._build_drive_query(vendor_id, doc_type)
         
-        async with self.session.get(
-            f"{self.base_url}/drive/v3/files",
-            params={
-                "q": query,
-                "fields": "files(id,name,mimeType,modifiedTime,webViewLink,properties)"
-            }
-        ) as response:
-            data = await response.json()
-            return [self._parse_document(item) for item in data.get("files", [])]
+        async with client_session(self.session) as session:
+            async with session.get(
+                f"{self.base_url}/drive/v3/files",
+                params={
+                    "q": query,
+                    "fields": "files(id,name,mimeType,modifiedTime,webViewLink,properties)"
+                }
+            ) as response:
+                data = await response.json()
+                return [self._parse_document(item) for item in data.get("files", [])]
 
     async def validate_document_set(self, vendor_id: str, required_docs: List[DocumentType]) -> Dict:
         """Validate if all required documents are present and valid"""
@@ -4,6 +4,7 @@ from enum import Enum
 from typing import List, Dict, Optional, Any
 import aiohttp
 import asyncio
+from .sessions import client_session
 
 @dataclass
 class ERPTransaction:
@@ -27,9 +28,11 @@ class ERPSystem(Enum):
     XERO = "xero"
 
 class ERPConnector:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, *, session: Optional[aiohttp.ClientSession] = None):
         self.api_key = api_key or "mock_api_key"
         self.base_url = "https://api.erp.com"
+        # Shared session to reuse pooled connections; each request opens its own when None
+        self.session = session
 
     def get_transaction_details(self, invoice_id: str) -> Dict[str, Any]:
         # Mock implementation
@@ -65,26 +68,24 @@ class NetSuiteConnector(ERPConnector):
         """Fetch NetSuite ledger entries for specified days"""
         start_date = datetime.now() - timedelta(days=days)
         
-        async with aiohttp.ClientSession(
-            headers={"Authorization": f"Bearer {self.api_key}"}
-        ) as session:
+        async with client_session(self.session) as session:
             async with session.get(
                 f"{self.base_url}/suitetalk/rest/transactions",
                 params={
                     "start_date": start_date.isoformat(),
                     "type": ["vendorbill", "vendorpayment"]
-                }
+                },
+                headers={"Authorization": f"Bearer {self.api_key}"}
             ) as response:
                 data = await response.json()
                 return [self._parse_transaction(item) for item in data["items"]]
 
     async def validate_tax_entries(self, transaction: ERPTransaction) -> Dict:
         """Validate tax entries in NetSuite"""
-        async with aiohttp.ClientSession(
-            headers={"Authorization": f"Bearer {self.api_key}"}
-        ) as session:
+        async with client_session(self.session) as session:
             async with session.get(
-                f"{self.base_url}/suitetalk/rest/transactions/{transaction.id}/tax"
+                f"{self.base_url}/suitetalk/rest/transactions/{transaction.id}/tax",
+                headers={"Authorization": f"Bearer {self.api_key}"}
             ) as response:
                 tax_data = await response.json()
                 
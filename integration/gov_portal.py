@@ -170,9 +170,11 @@ class HMRCPortal(TaxPortal):
             return await response.json()
 
 class GovPortalSubmitter:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, *, session: Optional[aiohttp.ClientSession] = None):
         self.api_key = api_key or "mock_api_key"
         self.base_url = "https://api.gov-portal.com"
+        # Shared session for portal calls; the mock submitter doesn't use it yet
+        self.session = session
 
     def submit_filing(self, filing_data: Dict) -> Dict[str, Any]:
         """Mock implementation of filing submission"""
@@ -197,12 +199,16 @@ class GovPortalSubmitter:
         }
 
 class FilingOrchestrator:
-    def __init__(self):
-        self.portals = {}
+    def __init__(self, portals: Optional[Dict[str, 'GovPortalSubmitter']] = None):
+        self.portals = dict(portals or {})
 
     def register_portal(self, jurisdiction: str, portal: 'GovPortalSubmitter'):
         self.portals[jurisdiction] = portal
 
+    def register_portals(self, portals: Dict[str, 'GovPortalSubmitter']):
+        """Register portals for several jurisdictions at once"""
+        self.portals.update(portals)
+
     def submit_filing(self, jurisdiction: str, filing_data: Dict) -> Dict[str, Any]:
         portal = self.portals.get(jurisdiction)
         if not portal:
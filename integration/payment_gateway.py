@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 import aiohttp
 import stripe
+from .sessions import client_session
 
 @dataclass
 class PaymentTransaction:
@@ -27,9 +28,11 @@ class TaxFlag:
     severity: str
 
 class PaymentGatewayConnector:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, *, session: Optional[aiohttp.ClientSession] = None):
         self.api_key = api_key or "mock_api_key"
         stripe.api_key = self.api_key
+        # Shared session to reuse pooled connections; each request opens its own when None
+        self.session = session
 
     def get_transactions(self, period: str) -> List[Dict[str, Any]]:
         # Mock implementation
@@ -77,7 +80,7 @@ class PaymentGatewayConnector:
 class StripeConnector(PaymentGatewayConnector):
     async def fetch_payouts(self, start_date: datetime) -> List[Dict[str, Any]]:
         """Fetch Stripe payouts for the specified period"""
-        async with aiohttp.ClientSession() as session:
+        async with client_session(self.session) as session:
             async with session.get(
                 f"https://api.stripe.com/v1/payouts",
                 params={
@@ -92,7 +95,7 @@ class StripeConnector(PaymentGatewayConnector):
 
     async def validate_tax_compliance(self, payout_id: str) -> Dict[str, Any]:
         """Validate Stripe payout tax compliance"""
-        async with aiohttp.ClientSession() as session:
+        async with client_session(self.session) as session:
             async with session.get(
                 f"https://api.stripe.com/v1/payouts/{payout_id}",
                 headers={"Authorization": f"Bearer {self.api_key}"}
@@ -116,7 +119,7 @@ class StripeConnector(PaymentGatewayConnector):
 class RazorpayConnector(PaymentGatewayConnector):
     async def fetch_payouts(self, start_date: datetime) -> List[Dict[str, Any]]:
         """Fetch Razorpay payouts for the specified period"""
-        async with aiohttp.ClientSession() as session:
+        async with client_session(self.session) as session:
             async with session.get(
                 f"https://api.razorpay.com/v1/payouts",
                 params={
@@ -130,7 +133,7 @@ class RazorpayConnector(PaymentGatewayConnector):
 
     async def validate_tax_compliance(self, payout_id: str) -> Dict[str, Any]:
         """Validate Razorpay payout tax compliance"""
-        async with aiohttp.ClientSession() as session:
+        async with client_session(self.session) as session:
             async with session.get(
                 f"https://api.razorpay.com/v1/payouts/{payout_id}",
                 headers={"Authorization": f"Bearer {self.api_key}"}
@@ -0,0 +1,13 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import aiohttp
+
+@asynccontextmanager
+async def client_session(session: Optional[aiohttp.ClientSession] = None) -> AsyncIterator[aiohttp.ClientSession]:
+    """Yield the injected session, or a temporary one that is closed on exit"""
+    if session is not None:
+        # Injected sessions are owned, and closed, by the caller
+        yield session
+    else:
+        async with aiohttp.ClientSession() as owned:
+            yield owned
@@ -0,0 +1,15 @@
+"""Indented JSON printing for the test scripts"""
+import sys
+import orjson
+
+def pj(obj, label: str = None):
+    """
+    Print obj as indented JSON, optionally after a label on the same line
+
+    Args:
+        obj: JSON-serializable object; dataclasses, enums and datetimes are handled by orjson
+        label: Text printed before the JSON
+    """
+    text = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    # One write through the text stream keeps ordering with surrounding print() calls
+    sys.stdout.write(f"{label} {text}\n" if label else f"{text}\n")
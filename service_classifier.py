@@ -1,7 +1,38 @@
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 import re
+import threading
 from enum import Enum
+import ahocorasick
+import orjson
+
+# Currency symbol or code ahead of an amount, with the gap after it
+_CURRENCY = r'(?:Rs\.?|INR|\$|USD|€|EUR|£|GBP)[,\s]*'
+
+# Stray commas around a label are skipped, as they were when commas used to be stripped
+# from the whole text. Each comma/space run has only one way to match, and the separator
+# must take the whole run, so a failed match doesn't retry shorter splits.
+_LABEL_GAP = r',*\s[,\s]*'
+_AMOUNT_SEP = r'[,\s]*(?::[,\s]*)?(?![,\s])'
+_TOTAL_LABEL = r'total,*\s(?:[,\s]*(?:amount|value))?'
+
+# Total amount with an optional label; labelled totals outrank a bare currency/amount match.
+# "net total 99" is left to the plain "total" label when that label matches on its own.
+_AMOUNT_RE = re.compile(
+    r'(?:(?:(?P<total>' + _TOTAL_LABEL + ')'
+    r'|(?P<grand>(?:grand|net|final)' + _LABEL_GAP +
+    r'(?!' + _TOTAL_LABEL + _AMOUNT_SEP + '(?:' + _CURRENCY + r')?\d)total)'
+    r'|(?P<payable>amount' + _LABEL_GAP + 'payable))' + _AMOUNT_SEP + '(?:' + _CURRENCY + ')?'
+    # Unlabelled: from the currency, or from the start of the whitespace run before the number
+    r'|' + _CURRENCY + r'|(?<!\s)\s*)'
+    r'(?P<amount>\d+(?:,\d+)*(?:\.\d{2})?)',
+    re.I
+)
+_AMOUNT_LABELS = ('total', 'grand', 'payable')
+
+def _parse_amount(amount: str) -> float:
+    """Parse a matched amount, dropping thousands separators such as 1,20,000.00"""
+    return float(amount.replace(',', ''))
 
 class ServiceType(Enum):
     """Types of services that can be provided"""
@@ -85,9 +116,20 @@ class ServiceClassification:
             'confidence_score': self.confidence_score
         }
 
+    def to_json(self) -> str:
+        """Convert to JSON; orjson writes the enums by value and the currency as a nested object"""
+        return orjson.dumps(self).decode()
+
 class ServiceClassifier:
     """Classifier for service type and transaction details"""
     
+    # HSN/SAC code prefixes that decide the service type on their own (extend as needed)
+    _HSN_MAP = {
+        '49': ServiceType.PRINTING,  # Chapter 49: Printed books, newspapers, etc.
+        '998311': ServiceType.CONSULTING,  # Management consulting services
+        '998312': ServiceType.CONSULTING,  # Business consulting services
+    }
+    
     def __init__(self):
         # Keywords indicating service types
         self.service_keywords = {
@@ -147,26 +189,66 @@ class ServiceClassifier:
                 'immediate', 'due on receipt', 'payable immediately', 'cash on delivery'
             ]
         }
-
-    def classify(self, invoice_text: str, hsn_sac_code: Optional[str] = None) -> ServiceClassification:
-        """Classify service type and transaction details from invoice text"""
         
-        # Determine service type
-        service_type = self._classify_service_type(invoice_text, hsn_sac_code)
+        # Hit counts are kept in a flat list with one integer slot per keyword category;
+        # Enum members are only looked up once the winning slots are known
+        categories = (
+            list(self.service_keywords) + [TransactionType.INTRA_GROUP] + list(self.payment_terms_keywords)
+        )
+        self._slots = {category: slot for slot, category in enumerate(categories)}
+        self._slot_count = len(categories)
+        # Each service slot with the most hits any service type after it could still reach
+        service_types = list(self.service_keywords)
+        self._service_slots = tuple(
+            (self._slots[t], t, max((len(set(self.service_keywords[later])) for later in service_types[i + 1:]), default=0))
+            for i, t in enumerate(service_types)
+        )
+        self._intra_group_slot = self._slots[TransactionType.INTRA_GROUP]
+        self._payment_slots = tuple((self._slots[t], t) for t in self.payment_terms_keywords)
         
-        # Determine transaction type
-        transaction_type = self._classify_transaction_type(invoice_text)
+        # Single automaton over every keyword, tagged with the slots it counts towards
+        tags: Dict[str, List[int]] = {}
+        for category, keywords in list(self.service_keywords.items()) + list(self.payment_terms_keywords.items()):
+            for keyword in keywords:
+                tags.setdefault(keyword, []).append(self._slots[category])
+        for keyword in self.intra_group_keywords:
+            tags.setdefault(keyword, []).append(self._intra_group_slot)
         
-        # Extract currency and amount
-        currency, amount = self._extract_currency_and_amount(invoice_text)
+        self._kw_automaton = ahocorasick.Automaton()
+        for keyword, slots in tags.items():
+            self._kw_automaton.add_word(keyword, (keyword, tuple(slots)))
+        self._kw_automaton.make_automaton()
+
+    def classify(
+        self, invoice_text: str,
+        hsn_sac_code: Optional[str] = None,
+        text_lower: Optional[str] = None
+    ) -> ServiceClassification:
+        """Classify service type and transaction details from invoice text
         
-        # Determine payment terms
-        payment_terms = self._classify_payment_terms(invoice_text)
+        Callers that already hold invoice_text.lower() can pass it as text_lower
+        to skip another copy of the text.
+        """
+        return self._classify_all(invoice_text, hsn_sac_code, text_lower)
+
+    def _classify_all(
+        self, text: str,
+        hsn_sac_code: Optional[str] = None,
+        text_lower: Optional[str] = None
+    ) -> ServiceClassification:
+        """Classify every aspect from one lowercase copy and a single keyword scan"""
+        if text_lower is None:
+            text_lower = text.lower()
         
-        # Calculate confidence score based on keyword matches
-        confidence_score = self._calculate_confidence_score(
-            invoice_text, service_type, transaction_type, payment_terms
-        )
+        # Count distinct keyword hits per category in one pass
+        hits = self._scan_keywords(text_lower)
+        
+        service_type = self._classify_service_type(hits, hsn_sac_code)
+        transaction_type = self._classify_transaction_type(hits)
+        payment_terms = self._classify_payment_terms(hits)
+        
+        # Currency symbols are matched case-sensitively, so the amount is read from the original text
+        currency, amount = self._extract_currency_and_amount(text)
         
         return ServiceClassification(
             service_type=service_type,
@@ -174,96 +256,93 @@ class ServiceClassifier:
             transaction_value=amount,
             currency=currency,
             payment_terms=payment_terms,
-            confidence_score=confidence_score
+            confidence_score=self._calculate_confidence_score(
+                hits, service_type, transaction_type, payment_terms
+            )
         )
 
-    def _classify_service_type(self, text: str, hsn_sac_code: Optional[str] = None) -> ServiceType:
-        """Classify the type of service based on text and HSN/SAC code"""
-        text = text.lower()
-        
-        # First check HSN/SAC code if available
+    def _scan_keywords(self, text_lower: str) -> List[int]:
+        """Count the distinct keywords found in lowercased text, per category slot"""
+        seen = set()
+        hits = [0] * self._slot_count
+        for _, (keyword, slots) in self._kw_automaton.iter(text_lower):
+            if keyword not in seen:
+                seen.add(keyword)
+                for slot in slots:
+                    hits[slot] += 1
+        return hits
+
+    def _classify_service_type(self, hits: List[int], hsn_sac_code: Optional[str] = None) -> ServiceType:
+        """Classify the type of service based on keyword hits and HSN/SAC code"""
+        # First check HSN/SAC code if available, longest matching prefix first
         if hsn_sac_code:
-            # Example HSN/SAC mappings (extend as needed)
-            if hsn_sac_code.startswith('49'):  # Chapter 49: Printed books, newspapers, etc.
-                return ServiceType.PRINTING
-            elif hsn_sac_code.startswith('99'):  # Services
-                if hsn_sac_code in ['998311', '998312']:  # Consulting services
-                    return ServiceType.CONSULTING
+            for length in range(len(hsn_sac_code), 0, -1):
+                service_type = self._HSN_MAP.get(hsn_sac_code[:length])
+                if service_type is not None:
+                    return service_type
         
-        # Check keywords in text
+        # Pick the service type with the most keyword hits
         max_matches = 0
         best_type = ServiceType.OTHER
         
-        for service_type, keywords in self.service_keywords.items():
-            matches = sum(1 for keyword in keywords if keyword in text)
+        for slot, service_type, remaining in self._service_slots:
+            matches = hits[slot]
             if matches > max_matches:
                 max_matches = matches
                 best_type = service_type
+            # Ties go to the earlier type, so stop once no later type can get strictly more hits
+            if max_matches >= remaining:
+                break
         
         return best_type
 
-    def _classify_transaction_type(self, text: str) -> TransactionType:
+    def _classify_transaction_type(self, hits: List[int]) -> TransactionType:
         """Classify the transaction as intra-group or third-party"""
-        text = text.lower()
-        
-        for keyword in self.intra_group_keywords:
-            if keyword in text:
-                return TransactionType.INTRA_GROUP
+        if hits[self._intra_group_slot]:
+            return TransactionType.INTRA_GROUP
         
         # If no intra-group keywords found, assume third-party
         return TransactionType.THIRD_PARTY
 
     def _extract_currency_and_amount(self, text: str) -> Tuple[Currency, float]:
         """Extract currency and total amount from text"""
-        text = text.replace(',', '')  # Remove commas from numbers
-        
-        # Try to find currency symbol/code and amount
-        currency_pattern = r'(?:Rs\.?|INR|\$|USD|€|EUR|£|GBP)?\s*(\d+(?:\.\d{2})?)'
+        currency = CurrencyHelper.CURRENCIES['INR']  # Default to INR
         
-        # First look for total amount
-        total_patterns = [
-            r'total\s+(?:amount|value)?\s*:?\s*(?:Rs\.?|INR|\$|USD|€|EUR|£|GBP)?\s*(\d+(?:\.\d{2})?)',
-            r'(?:grand|net|final)\s+total\s*:?\s*(?:Rs\.?|INR|\$|USD|€|EUR|£|GBP)?\s*(\d+(?:\.\d{2})?)',
-            r'amount\s+payable\s*:?\s*(?:Rs\.?|INR|\$|USD|€|EUR|£|GBP)?\s*(\d+(?:\.\d{2})?)',
-            currency_pattern
-        ]
+        # Single scan, keeping the first positive amount of the highest-ranked label
+        best = None
+        best_rank = len(_AMOUNT_LABELS)
+        for match in _AMOUNT_RE.finditer(text):
+            rank = next(
+                (i for i, label in enumerate(_AMOUNT_LABELS) if match.group(label) is not None),
+                len(_AMOUNT_LABELS)
+            )
+            if (best is None or rank < best_rank) and _parse_amount(match.group('amount')) > 0:
+                best, best_rank = match, rank
+                if rank == 0:
+                    break
         
-        amount = 0.0
-        currency = CurrencyHelper.CURRENCIES['INR']  # Default to INR
+        if best is None:
+            return currency, 0.0
         
-        # Try to find currency and amount
-        for pattern in total_patterns:
-            matches = re.finditer(pattern, text, re.I)
-            for match in matches:
-                # Look for currency symbol/code before the amount
-                pre_amount = text[max(0, match.start() - 10):match.start()]
-                for symbol, code in CurrencyHelper.SYMBOLS_TO_CODE.items():
-                    if symbol in pre_amount:
-                        currency = CurrencyHelper.CURRENCIES[code]
-                        break
-                
-                try:
-                    amount = float(match.group(1))
-                    if amount > 0:  # Found a valid amount
-                        return currency, amount
-                except (ValueError, IndexError):
-                    continue
+        # Look for currency symbol/code before the amount
+        pre_amount = text[max(0, best.start() - 10):best.start()]
+        for symbol, code in CurrencyHelper.SYMBOLS_TO_CODE.items():
+            if symbol in pre_amount:
+                currency = CurrencyHelper.CURRENCIES[code]
+                break
         
-        return currency, amount
+        return currency, _parse_amount(best.group('amount'))
 
-    def _classify_payment_terms(self, text: str) -> PaymentTerms:
-        """Classify payment terms from text"""
-        text = text.lower()
-        
-        for terms, keywords in self.payment_terms_keywords.items():
-            for keyword in keywords:
-                if keyword in text:
-                    return terms
+    def _classify_payment_terms(self, hits: List[int]) -> PaymentTerms:
+        """Classify payment terms from keyword hits"""
+        for slot, terms in self._payment_slots:
+            if hits[slot]:
+                return terms
         
         return PaymentTerms.UNKNOWN
 
     def _calculate_confidence_score(
-        self, text: str, 
+        self, hits: List[int], 
         service_type: ServiceType,
         transaction_type: TransactionType,
         payment_terms: PaymentTerms
@@ -273,17 +352,29 @@ class ServiceClassifier:
         total_factors = 3  # Number of classification aspects
         
         # Service type confidence
-        if service_type != ServiceType.OTHER:
+        if service_type is not ServiceType.OTHER:
             keywords = self.service_keywords.get(service_type, [])
-            matches = sum(1 for keyword in keywords if keyword in text.lower())
-            score += min(matches / len(keywords), 1.0)
+            score += min(hits[self._slots[service_type]] / len(keywords), 1.0)
         
         # Transaction type confidence
-        if transaction_type != TransactionType.UNKNOWN:
+        if transaction_type is not TransactionType.UNKNOWN:
             score += 1.0
         
         # Payment terms confidence
-        if payment_terms != PaymentTerms.UNKNOWN:
+        if payment_terms is not PaymentTerms.UNKNOWN:
             score += 1.0
         
         return score / total_factors
+
+# Process-wide classifier; its keyword automaton is read-only once built
+_CLASSIFIER_SINGLETON: Optional[ServiceClassifier] = None
+_CLASSIFIER_LOCK = threading.Lock()
+
+def get_classifier() -> ServiceClassifier:
+    """Return the shared ServiceClassifier, building it on first use"""
+    global _CLASSIFIER_SINGLETON
+    if _CLASSIFIER_SINGLETON is None:
+        with _CLASSIFIER_LOCK:
+            if _CLASSIFIER_SINGLETON is None:
+                _CLASSIFIER_SINGLETON = ServiceClassifier()
+    return _CLASSIFIER_SINGLETON
@@ -1,7 +1,12 @@
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
+import functools
+import sys
+import threading
+from dataclasses import dataclass, replace
+from typing import ClassVar, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Set, Tuple
 from enum import Enum
 from datetime import datetime
+import numpy as np
+import orjson
 
 class TaxJurisdiction(Enum):
     """Major tax jurisdictions"""
@@ -51,7 +56,37 @@ class TaxType(Enum):
     MWST = "Mehrwertsteuer"  # German VAT
     TVA = "Taxe sur la Valeur Ajoutée"  # French VAT
 
-@dataclass
+# Number of distinct get_tax_advice queries cached, shared by every engine
+_ADVICE_CACHE_SIZE = 4096
+
+# Enum members by value, for lookups that don't raise on unknown input
+_JURIS_BY_VALUE = {j.value: j for j in TaxJurisdiction}
+_SERVICE_BY_VALUE = {s.value: s for s in ServiceCategory}
+
+# Shared empty container; advice lists are only allocated once something is written
+_EMPTY: tuple = ()
+
+# Tax types a DTAA can reduce
+_WHT_OR_TDS: FrozenSet[TaxType] = frozenset({TaxType.WITHHOLDING, TaxType.TDS})
+# Services a DTAA has a withholding rate for
+_TREATY_ELIGIBLE: FrozenSet[ServiceCategory] = frozenset({
+    ServiceCategory.ROYALTY, ServiceCategory.TECHNICAL, ServiceCategory.CONSULTING
+})
+# Services eligible for reduced Indian withholding with a TRC
+_TRC_REDUCED_SERVICES: FrozenSet[ServiceCategory] = frozenset({ServiceCategory.SAAS, ServiceCategory.ROYALTY})
+
+def _apply_rates(amounts: np.ndarray, rows: np.ndarray, rates: np.ndarray):
+    """Tax each (row, rate) pair and total it per row
+
+    One gather-multiply over all pairs and one bincount reduction, instead of
+    a multiply and scatter-add per corridor rule.
+    """
+    taxed = amounts.take(rows)
+    np.multiply(taxed, rates, out=taxed)
+    totals = np.bincount(rows, weights=taxed, minlength=len(amounts))
+    return taxed, totals
+
+@dataclass(frozen=True)
 class TaxRate:
     """Tax rate with conditions"""
     rate: float
@@ -59,7 +94,13 @@ class TaxRate:
     currency: str = "USD"
     notes: Optional[str] = None
 
-@dataclass
+class TaxRule(NamedTuple):
+    """Tax charged on a cross-border corridor, as a fraction of the amount"""
+    type: str
+    rate: float
+    notes: str
+
+@dataclass(frozen=True)
 class TaxForm:
     """Tax form details"""
     form_number: str
@@ -67,7 +108,7 @@ class TaxForm:
     filing_deadline: str
     notes: Optional[str] = None
 
-@dataclass
+@dataclass(frozen=True)
 class DTAATreaty:
     """Double Tax Avoidance Agreement details"""
     country1: str
@@ -77,7 +118,7 @@ class DTAATreaty:
     permanent_establishment_days: int
     special_provisions: List[str]
 
-@dataclass
+@dataclass(frozen=True)
 class TaxAdvice:
     """Tax advice for a specific scenario"""
     applicable_taxes: Dict[TaxType, TaxRate]
@@ -119,17 +160,50 @@ class TaxAdvice:
             "compliance_notes": self.compliance_notes
         }
 
+    def to_json(self) -> str:
+        """Convert to JSON straight from the dataclasses; same layout as to_dict"""
+        # Tax types key the rates, so orjson writes those enum keys by value
+        return orjson.dumps(self, option=orjson.OPT_NON_STR_KEYS).decode()
+
 class TaxEngine:
     """Engine for determining applicable taxes based on jurisdiction and service type"""
     
+    # EU member states for VAT handling, interned to match the interned country arguments
+    _EU_MEMBERS: ClassVar[FrozenSet[str]] = frozenset(map(sys.intern, (
+        "Germany", "France", "Italy", "Spain", "Netherlands",
+        "Belgium", "Austria", "Ireland", "Greece", "Portugal",
+        "Finland", "Sweden", "Denmark", "Poland", "Czech Republic",
+        "Romania", "Hungary", "Slovakia", "Croatia", "Bulgaria",
+        "Lithuania", "Slovenia", "Latvia", "Estonia", "Cyprus",
+        "Luxembourg", "Malta"
+        # Note: UK removed from EU member states post-Brexit
+    )))
+    
+    # Rate tables are read-only, so they are built once and shared by every instance
+    _loaded: ClassVar[bool] = False
+    _init_lock: ClassVar[threading.Lock] = threading.Lock()
+    
     def __init__(self):
-        self._load_tax_treaties()
-        self._load_tax_rates()
-        self._load_compliance_requirements()
-
-    def _load_tax_treaties(self):
+        cls = type(self)
+        if not cls._loaded:
+            with cls._init_lock:
+                if not cls._loaded:
+                    cls._load_all()
+                    cls._loaded = True
+
+    @classmethod
+    def _load_all(cls):
+        """Load every rate table onto the class"""
+        cls._load_tax_treaties()
+        cls._load_tax_rates()
+        cls._load_compliance_requirements()
+        cls._load_corridor_rules()
+        cls._build_tax_plans()
+
+    @classmethod
+    def _load_tax_treaties(cls):
         """Load DTAA treaties data"""
-        self.tax_treaties = {
+        treaties = {
             # India-US DTAA
             ("India", "United States"): DTAATreaty(
                 country1="India",
@@ -182,21 +256,19 @@ class TaxEngine:
                 ]
             )
         }
-        
-        # Add EU member states for VAT handling
-        self.eu_member_states = {
-            "Germany", "France", "Italy", "Spain", "Netherlands",
-            "Belgium", "Austria", "Ireland", "Greece", "Portugal",
-            "Finland", "Sweden", "Denmark", "Poland", "Czech Republic",
-            "Romania", "Hungary", "Slovakia", "Croatia", "Bulgaria",
-            "Lithuania", "Slovenia", "Latvia", "Estonia", "Cyprus",
-            "Luxembourg", "Malta"
-            # Note: UK removed from EU member states post-Brexit
+        # Interned keys hash once; countries without any treaty skip the pair lookup entirely
+        cls.tax_treaties = {
+            (sys.intern(country1), sys.intern(country2)): treaty
+            for (country1, country2), treaty in treaties.items()
         }
+        cls._treaty_countries = frozenset(
+            country for pair in cls.tax_treaties for country in pair
+        )
 
-    def _load_tax_rates(self):
+    @classmethod
+    def _load_tax_rates(cls):
         """Load tax rates for different jurisdictions"""
-        self.tax_rates = {
+        cls.tax_rates = {
             TaxJurisdiction.INDIA: {
                 ServiceCategory.TECHNICAL: {
                     TaxType.TDS: TaxRate(10.0, notes="Section 194J applicable"),
@@ -315,9 +387,10 @@ class TaxEngine:
             }
         }
 
-    def _load_compliance_requirements(self):
+    @classmethod
+    def _load_compliance_requirements(cls):
         """Load compliance requirements for different jurisdictions"""
-        self.compliance_forms = {
+        cls.compliance_forms = {
             TaxJurisdiction.INDIA: {
                 TaxType.TDS: [
                     TaxForm(
@@ -434,6 +507,37 @@ class TaxEngine:
             }
         }
 
+    @classmethod
+    def _load_corridor_rules(cls):
+        """Load taxes for (source country, destination country, transaction type) corridors"""
+        # Export of services from India: zero-rated GST, Singapore WHT
+        india_to_singapore = (
+            TaxRule("GST", 0.0, "Zero-rated for exports"),
+            TaxRule("WHT", 0.17, "Singapore WHT on technical services")
+        )
+        # Import of services to India: IGST, Indian WHT
+        singapore_to_india = (
+            TaxRule("IGST", 0.18, "IGST on import of services"),
+            TaxRule("WHT", 0.10, "India WHT on technical services")
+        )
+        cls._corridor_rules = {}
+        for transaction_type in ("Digital Services", "Technical Services"):
+            cls._corridor_rules[("India", "Singapore", transaction_type)] = india_to_singapore
+            cls._corridor_rules[("Singapore", "India", transaction_type)] = singapore_to_india
+
+    @classmethod
+    def _build_tax_plans(cls):
+        """Flatten rates and their filing forms into one lookup per jurisdiction and service"""
+        # (jurisdiction, service) -> ((tax_type, rate, forms for that tax type), ...)
+        cls._plan = {}
+        for jurisdiction, service_rates_by_category in cls.tax_rates.items():
+            jurisdiction_forms = cls.compliance_forms.get(jurisdiction, {})
+            for service_category, service_rates in service_rates_by_category.items():
+                cls._plan[(jurisdiction, service_category)] = tuple(
+                    (tax_type, rate, tuple(jurisdiction_forms.get(tax_type, ())))
+                    for tax_type, rate in service_rates.items()
+                )
+
     def get_tax_advice(
         self,
         payer_country: str,
@@ -459,78 +563,140 @@ class TaxEngine:
         Returns:
             TaxAdvice object containing applicable taxes and compliance requirements
         """
-        try:
-            payer_jurisdiction = TaxJurisdiction(payer_country)
-            service_category = ServiceCategory(service_type)
-        except ValueError:
+        advice = self._cached_advice(
+            payer_country, vendor_country, service_type, currency,
+            bool(has_permanent_establishment), bool(tax_residency_certificate)
+        )
+        return self._copy_advice(advice)
+
+    def get_tax_advice_batch(self, scenarios: List[Dict]) -> List[TaxAdvice]:
+        """
+        Determine tax advice for many transactions in one pass
+        
+        Args:
+            scenarios: Dicts of get_tax_advice keyword arguments; payer_country,
+                vendor_country and service_type are required, other keys are
+                optional and unknown keys are ignored
+        
+        Returns:
+            TaxAdvice per scenario, in input order
+        """
+        # Scenarios sharing the same inputs are computed once for the batch
+        advice_by_key = {}
+        results = []
+        for scenario in scenarios:
+            key = (
+                scenario["payer_country"],
+                scenario["vendor_country"],
+                scenario["service_type"],
+                scenario.get("currency", "USD"),
+                bool(scenario.get("has_permanent_establishment", False)),
+                bool(scenario.get("tax_residency_certificate", False))
+            )
+            advice = advice_by_key.get(key)
+            if advice is None:
+                advice = advice_by_key[key] = self._cached_advice(*key)
+            results.append(self._copy_advice(advice))
+        return results
+
+    @staticmethod
+    def _copy_advice(advice: TaxAdvice) -> TaxAdvice:
+        """Give the caller its own containers, as lists, since cached advice is shared"""
+        return replace(
+            advice,
+            applicable_taxes=dict(advice.applicable_taxes),
+            filing_requirements=list(advice.filing_requirements),
+            exemptions=list(advice.exemptions),
+            compliance_notes=list(advice.compliance_notes)
+        )
+
+    @classmethod
+    @functools.lru_cache(maxsize=_ADVICE_CACHE_SIZE)
+    def _cached_advice(
+        cls,
+        payer_country: str,
+        vendor_country: str,
+        service_type: str,
+        currency: str,
+        has_permanent_establishment: bool,
+        tax_residency_certificate: bool
+    ) -> TaxAdvice:
+        """Build tax advice, cached on the class since it reads only the class-level rate tables
+
+        The transaction value does not affect the result, so it is not an input.
+        """
+        payer_jurisdiction = _JURIS_BY_VALUE.get(payer_country)
+        service_category = _SERVICE_BY_VALUE.get(service_type)
+        if payer_jurisdiction is None or service_category is None:
             raise ValueError("Invalid country or service type")
 
+        # Intern only once validated, so non-str input still gets the ValueError above
+        payer_country = sys.intern(payer_country)
+        if isinstance(vendor_country, str):
+            vendor_country = sys.intern(vendor_country)
+
         # Get DTAA treaty if applicable
-        dtaa_treaty = self.tax_treaties.get((payer_country, vendor_country))
+        dtaa_treaty = None
+        if payer_country in cls._treaty_countries and vendor_country in cls._treaty_countries:
+            dtaa_treaty = cls.tax_treaties.get((payer_country, vendor_country))
 
-        # Initialize collections
+        # Initialize collections; the cached advice keeps tuples, get_tax_advice hands out lists
         applicable_taxes = {}
-        filing_requirements = []
-        exemptions = []
-        compliance_notes = []
-
-        # Check for permanent establishment implications
-        pe_risk = self._assess_permanent_establishment_risk(
-            payer_country, vendor_country, has_permanent_establishment, dtaa_treaty
-        )
+        filing_requirements = _EMPTY
+        exemptions = _EMPTY
+        compliance_notes = _EMPTY
+
+        # Permanent establishment risk only arises from an existing PE; treaty PE days don't add any
+        pe_risk = has_permanent_establishment
+
+        # Treaty rate for this service, if the treaty covers it
+        treaty_rate = None
+        if dtaa_treaty is not None and service_category in _TREATY_ELIGIBLE:
+            treaty_rate = dtaa_treaty.withholding_rates.get(
+                "royalty" if service_category is ServiceCategory.ROYALTY else "technical_services"
+            )
 
         # Special handling for intra-EU transactions
         is_intra_eu = (
-            payer_country in self.eu_member_states and 
-            vendor_country in self.eu_member_states
+            payer_country in TaxEngine._EU_MEMBERS and 
+            vendor_country in TaxEngine._EU_MEMBERS
         )
 
         # Determine applicable taxes based on jurisdiction and service type
-        jurisdiction_rates = self.tax_rates.get(payer_jurisdiction, {})
-        service_rates = jurisdiction_rates.get(service_category, {})
-
-        for tax_type, rate in service_rates.items():
+        for tax_type, rate, forms in cls._plan.get((payer_jurisdiction, service_category), ()):
             # Skip withholding tax for intra-EU transactions
-            if is_intra_eu and tax_type == TaxType.WITHHOLDING:
-                exemptions.append("Intra-EU supply - No withholding tax applicable")
+            if is_intra_eu and tax_type is TaxType.WITHHOLDING:
+                exemptions += ("Intra-EU supply - No withholding tax applicable",)
                 continue
 
             # Apply DTAA benefits if applicable
-            if dtaa_treaty and tax_type in [TaxType.WITHHOLDING, TaxType.TDS]:
-                treaty_rate = self._get_treaty_rate(dtaa_treaty, service_category)
-                if treaty_rate is not None and treaty_rate < rate.rate:
-                    rate = TaxRate(
-                        treaty_rate,
-                        rate.currency_threshold,
-                        currency,
-                        f"DTAA rate applied ({payer_country}-{vendor_country} treaty)"
-                    )
-                    compliance_notes.append(
-                        f"DTAA benefit applied: Rate reduced to {treaty_rate}%"
-                    )
-
-            # Update currency in tax rate
-            rate.currency = currency
-            applicable_taxes[tax_type] = rate
-
-        # Get filing requirements
-        jurisdiction_forms = self.compliance_forms.get(payer_jurisdiction, {})
-        for tax_type in applicable_taxes.keys():
-            if tax_type in jurisdiction_forms:
-                filing_requirements.extend(jurisdiction_forms[tax_type])
+            if treaty_rate is not None and tax_type in _WHT_OR_TDS and treaty_rate < rate.rate:
+                rate = TaxRate(
+                    treaty_rate,
+                    rate.currency_threshold,
+                    currency,
+                    f"DTAA rate applied ({payer_country}-{vendor_country} treaty)"
+                )
+                compliance_notes += (
+                    f"DTAA benefit applied: Rate reduced to {treaty_rate}%",
+                )
+
+            # Rates are shared across calls, so a different currency gets its own copy
+            applicable_taxes[tax_type] = rate if rate.currency == currency else replace(rate, currency=currency)
+            filing_requirements += forms
 
         # Add relevant compliance notes
         if tax_residency_certificate:
-            compliance_notes.append(
-                "Tax Residency Certificate available - DTAA benefits applicable"
+            compliance_notes += (
+                "Tax Residency Certificate available - DTAA benefits applicable",
             )
         if has_permanent_establishment:
-            compliance_notes.append(
-                "Permanent Establishment exists - Local tax laws applicable"
+            compliance_notes += (
+                "Permanent Establishment exists - Local tax laws applicable",
             )
         if is_intra_eu:
-            compliance_notes.append(
-                "Intra-EU transaction - Special VAT rules apply"
+            compliance_notes += (
+                "Intra-EU transaction - Special VAT rules apply",
             )
 
         return TaxAdvice(
@@ -542,28 +708,6 @@ class TaxEngine:
             compliance_notes=compliance_notes
         )
 
-    def _assess_permanent_establishment_risk(
-        self,
-        payer_country: str,
-        vendor_country: str,
-        has_pe: bool,
-        dtaa_treaty: Optional[DTAATreaty]
-    ) -> bool:
-        """Assess permanent establishment risk"""
-        if has_pe:
-            return True
-        if dtaa_treaty and dtaa_treaty.permanent_establishment_days > 0:
-            return False
-        return False
-
-    def _get_treaty_rate(self, treaty: DTAATreaty, service_category: ServiceCategory) -> Optional[float]:
-        """Get applicable rate from tax treaty"""
-        if service_category == ServiceCategory.ROYALTY:
-            return treaty.withholding_rates.get("royalty")
-        elif service_category in [ServiceCategory.TECHNICAL, ServiceCategory.CONSULTING]:
-            return treaty.withholding_rates.get("technical_services")
-        return None
-
     def _determine_exemptions(
         self,
         jurisdiction: TaxJurisdiction,
@@ -579,7 +723,7 @@ class TaxEngine:
         if jurisdiction == TaxJurisdiction.INDIA:
             if service_category == ServiceCategory.TECHNICAL and value < 30000:
                 exemptions.append("TDS exemption under Section 194J for amount below threshold")
-            if not has_pe and service_category in [ServiceCategory.SAAS, ServiceCategory.ROYALTY]:
+            if not has_pe and service_category in _TRC_REDUCED_SERVICES:
                 exemptions.append("Eligible for reduced withholding under DTAA with valid TRC")
 
         # US-specific exemptions
@@ -603,55 +747,16 @@ class TaxEngine:
         }
 
         # Determine applicable taxes based on countries and transaction type
-        if source_country == "India" and destination_country == "Singapore":
-            # Export of services
-            if transaction_type in ["Digital Services", "Technical Services"]:
-                # Zero-rated GST for exports
-                tax = {
-                    "type": "GST",
-                    "rate": 0.0,
-                    "amount": 0.0,
-                    "notes": "Zero-rated for exports"
-                }
-                result["applicable_taxes"].append(tax)
-                
-                # Check if WHT applies
-                wht_rate = 0.17
-                if wht_rate > 0:
-                    wht = {
-                        "type": "WHT",
-                        "rate": wht_rate,
-                        "amount": amount * wht_rate,
-                        "notes": "Singapore WHT on technical services"
-                    }
-                    result["applicable_taxes"].append(wht)
-                    result["total_tax_amount"] += wht["amount"]
-
-        elif source_country == "Singapore" and destination_country == "India":
-            # Import of services to India
-            if transaction_type in ["Digital Services", "Technical Services"]:
-                # IGST applies on import of services
-                igst_rate = 0.18
-                igst = {
-                    "type": "IGST",
-                    "rate": igst_rate,
-                    "amount": amount * igst_rate,
-                    "notes": "IGST on import of services"
-                }
-                result["applicable_taxes"].append(igst)
-                result["total_tax_amount"] += igst["amount"]
-
-                # Indian WHT may apply
-                wht_rate = 0.10
-                if wht_rate > 0:
-                    wht = {
-                        "type": "WHT",
-                        "rate": wht_rate,
-                        "amount": amount * wht_rate,
-                        "notes": "India WHT on technical services"
-                    }
-                    result["applicable_taxes"].append(wht)
-                    result["total_tax_amount"] += wht["amount"]
+        rules = self._corridor_rules.get((source_country, destination_country, transaction_type), ())
+        result["applicable_taxes"] = [
+            {
+                "type": rule.type,
+                "rate": rule.rate,
+                "amount": amount * rule.rate,
+                "notes": rule.notes
+            } for rule in rules
+        ]
+        result["total_tax_amount"] = sum((tax["amount"] for tax in result["applicable_taxes"]), 0.0)
 
         # Add compliance requirements
         result["compliance_requirements"] = self._get_compliance_requirements(
@@ -660,6 +765,65 @@ class TaxEngine:
 
         return result
 
+    def analyze_transactions_bulk(self, source_countries: Sequence[str],
+                                  destination_countries: Sequence[str],
+                                  transaction_types: Sequence[str],
+                                  amounts: Sequence[float]) -> Dict[str, np.ndarray]:
+        """Analyze a batch of transactions column-wise
+
+        Rows are grouped by corridor, then every (row, rule) pair is taxed in
+        one gather-multiply and totalled per row with np.bincount.
+
+        Args:
+            source_countries: Source country per transaction
+            destination_countries: Destination country per transaction
+            transaction_types: Transaction type per transaction
+            amounts: Transaction amount per transaction
+
+        Returns:
+            Dict of columns with one entry per applicable tax ("row", "type",
+            "rate", "amount", "notes"), where "row" indexes the input, plus
+            "total_tax_amount" with one entry per transaction
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if not (len(source_countries) == len(destination_countries) == len(transaction_types) == len(amounts)):
+            raise ValueError("Transaction columns must have the same length")
+
+        rows_by_corridor: Dict[Tuple[str, str, str], List[int]] = {}
+        for row, corridor in enumerate(zip(source_countries, destination_countries, transaction_types)):
+            if corridor in self._corridor_rules:
+                rows_by_corridor.setdefault(corridor, []).append(row)
+
+        tax_rows, tax_types, tax_rates, tax_notes = [], [], [], []
+        for corridor, rows in rows_by_corridor.items():
+            rows = np.asarray(rows, dtype=np.intp)
+            for rule in self._corridor_rules[corridor]:
+                tax_rows.append(rows)
+                tax_types.append(np.full(len(rows), rule.type, dtype=object))
+                tax_rates.append(np.full(len(rows), rule.rate, dtype=np.float64))
+                tax_notes.append(np.full(len(rows), rule.notes, dtype=object))
+
+        if not tax_rows:
+            return {
+                "row": np.empty(0, dtype=np.intp),
+                "type": np.empty(0, dtype=object),
+                "rate": np.empty(0, dtype=np.float64),
+                "amount": np.empty(0, dtype=np.float64),
+                "notes": np.empty(0, dtype=object),
+                "total_tax_amount": np.zeros(len(amounts), dtype=np.float64)
+            }
+        tax_rows = np.concatenate(tax_rows)
+        tax_rates = np.concatenate(tax_rates)
+        tax_amounts, totals = _apply_rates(amounts, tax_rows, tax_rates)
+        return {
+            "row": tax_rows,
+            "type": np.concatenate(tax_types),
+            "rate": tax_rates,
+            "amount": tax_amounts,
+            "notes": np.concatenate(tax_notes),
+            "total_tax_amount": totals
+        }
+
     def _get_compliance_requirements(self, source_country: str, 
                                   destination_country: str,
                                   applicable_taxes: list) -> list:
@@ -1,6 +1,11 @@
-import json
 import asyncio
+import functools
+import aiohttp
 from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Iterable, List, Mapping
+import orjson
 from tax_engine import TaxEngine
 from compliance_engine import ComplianceEngine
 from compliance_validator import ComplianceValidator
@@ -9,12 +14,17 @@ from integration.erp_connector import ERPConnector
 from integration.payment_gateway import PaymentGatewayConnector
 from integration.document_manager import DocumentManager
 from integration.gov_portal import GovPortalSubmitter, FilingOrchestrator
+from json_output import pj
 
-async def test_invoice_processing():
-    # Load sample invoice
-    with open('sample_data/sample_invoice.json', 'r') as f:
-        invoice_data = json.load(f)
+# Invoices processed at once by process_invoices
+MAX_CONCURRENT_INVOICES = 16
 
+@functools.lru_cache(maxsize=None)
+def _invoice() -> Mapping[str, Any]:
+    """Parse the sample invoice once per process; read-only since every caller shares it"""
+    return MappingProxyType(orjson.loads(Path('sample_data/sample_invoice.json').read_bytes()))
+
+async def process_invoice(invoice_data: Mapping[str, Any], session: aiohttp.ClientSession):
     print("\n=== Testing Tax Engine ===")
     tax_engine = TaxEngine()
     tax_advice = tax_engine.analyze_transaction(
@@ -23,7 +33,7 @@ async def test_invoice_processing():
         transaction_type="Digital Services",
         amount=invoice_data['payment']['subtotal']
     )
-    print("Tax Engine Output:", json.dumps(tax_advice, indent=2))
+    pj(tax_advice, "Tax Engine Output:")
 
     print("\n=== Testing Compliance Engine ===")
     compliance_engine = ComplianceEngine()
@@ -32,7 +42,7 @@ async def test_invoice_processing():
         "amount": invoice_data['payment']['subtotal'],
         "date": datetime.now()
     })
-    print("Compliance Checklist:", json.dumps(checklist, indent=2))
+    pj(checklist, "Compliance Checklist:")
 
     print("\n=== Testing Compliance Validator ===")
     validator = ComplianceValidator()
@@ -41,37 +51,73 @@ async def test_invoice_processing():
         "valid_tax_id": invoice_data['vendor']['tax_id'],
         "filing_history": ["2024Q4", "2025Q1"]
     })
-    print("Validation Result:", json.dumps(validation_result, indent=2))
+    pj(validation_result, "Validation Result:")
 
-    print("\n=== Testing CFO Automation ===")
+    # The integrations don't depend on each other, so run them concurrently;
+    # sync connectors go to the default executor (asyncio.to_thread needs 3.9)
+    loop = asyncio.get_running_loop()
     cfo = CFOAutomationOrchestrator()
-    transaction_result = await cfo.process_transaction(invoice_data['invoice_id'])
-    print("Transaction Processing Result:", json.dumps(transaction_result, indent=2))
+    erp = ERPConnector(session=session)
+    payment = PaymentGatewayConnector(session=session)
+    docs = DocumentManager(session=session)
+    gov_portal = GovPortalSubmitter(session=session)
+    transaction_result, ledger_entries, payment_status, vendor_docs, filing_result = await asyncio.gather(
+        cfo.process_transaction(invoice_data['invoice_id']),
+        erp.fetch_ledger_entries(30),  # Last 30 days
+        loop.run_in_executor(None, payment.verify_payment, invoice_data['invoice_id']),
+        docs.fetch_documents(invoice_data['vendor']['id']),
+        loop.run_in_executor(None, gov_portal.submit_filing, {
+            "form_type": "GST",
+            "period": "2025Q1",
+            "amount": invoice_data['payment']['tax']['gst'],
+            "invoice_id": invoice_data['invoice_id']
+        })
+    )
+
+    print("\n=== Testing CFO Automation ===")
+    pj(transaction_result, "Transaction Processing Result:")
 
     print("\n=== Testing ERP Integration ===")
-    erp = ERPConnector()
-    ledger_entries = await erp.fetch_ledger_entries(30)  # Last 30 days
-    print("ERP Ledger Entries:", json.dumps(ledger_entries, indent=2))
+    pj(ledger_entries, "ERP Ledger Entries:")
 
     print("\n=== Testing Payment Gateway ===")
-    payment = PaymentGatewayConnector()
-    payment_status = payment.verify_payment(invoice_data['invoice_id'])
     print("Payment Verification:", payment_status)
 
     print("\n=== Testing Document Management ===")
-    docs = DocumentManager()
-    vendor_docs = await docs.fetch_documents(invoice_data['vendor']['id'])
-    print("Vendor Documents:", json.dumps(vendor_docs, indent=2))
+    pj(vendor_docs, "Vendor Documents:")
 
     print("\n=== Testing Government Portal Integration ===")
-    gov_portal = GovPortalSubmitter()
-    filing_result = gov_portal.submit_filing({
-        "form_type": "GST",
-        "period": "2025Q1",
-        "amount": invoice_data['payment']['tax']['gst'],
-        "invoice_id": invoice_data['invoice_id']
-    })
-    print("Filing Result:", json.dumps(filing_result, indent=2))
+    pj(filing_result, "Filing Result:")
+
+async def process_invoices(invoices: Iterable[Mapping[str, Any]], limit: int = MAX_CONCURRENT_INVOICES) -> List[Any]:
+    """
+    Process invoices concurrently, with at most `limit` in flight
+
+    A slot is acquired before each task is created, so the number of live
+    tasks stays bounded however many invoices are passed. If one invoice
+    fails, the others are cancelled, as a TaskGroup would (3.11+ only).
+    """
+    semaphore = asyncio.Semaphore(limit)
+    tasks = []
+    # One pooled session for every connector, so connections and TLS handshakes are reused
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=60)
+    ) as session:
+        try:
+            for invoice_data in invoices:
+                await semaphore.acquire()
+                task = asyncio.ensure_future(process_invoice(invoice_data, session))
+                task.add_done_callback(lambda _: semaphore.release())
+                tasks.append(task)
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+async def test_invoice_processing():
+    # Load sample invoice
+    await process_invoices([_invoice()])
 
 if __name__ == "__main__":
     asyncio.run(test_invoice_processing())
@@ -1,13 +1,40 @@
-import json
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
 from tax_engine import TaxEngine, ServiceCategory, TaxJurisdiction
+import invoice_analyzer
+import service_classifier
 from invoice_analyzer import InvoiceAnalyzer
+from json_output import pj
+
+CACHE_DIR = Path('.cache')
+
+def _load_or_extract(path: str):
+    """Analyze an invoice PDF, reusing a pickled result while the file and analyzer code are unchanged"""
+    st = os.stat(path)
+    # Analyzer edits change the result, so their source is part of the key
+    code = hashlib.sha1()
+    for module in (invoice_analyzer, service_classifier):
+        code.update(Path(module.__file__).read_bytes())
+    key = f"{path}:{st.st_mtime_ns}:{st.st_size}:{code.hexdigest()}"
+    cache_path = CACHE_DIR / f"invoice_{hashlib.sha1(key.encode()).hexdigest()}.pkl"
+    if cache_path.exists():
+        return pickle.loads(cache_path.read_bytes())
+
+    result = InvoiceAnalyzer().analyze_invoice(path)
+    CACHE_DIR.mkdir(exist_ok=True)
+    # Write to a uniquely named file then rename, so neither an interrupted run nor
+    # parallel xdist workers can leave a truncated cache entry
+    with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix='.tmp', delete=False) as tmp:
+        pickle.dump(result, tmp, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp.name, cache_path)
+    return result
 
 def test_tax_engine():
     # First analyze the invoice
-    analyzer = InvoiceAnalyzer()
-    with open('invoice.pdf', 'rb') as f:
-        text, images = analyzer.extract_text_from_pdf('invoice.pdf')
-    analysis = analyzer.analyze_invoice(text)
+    analysis = _load_or_extract('invoice.pdf')
     
     # Initialize tax engine
     tax_engine = TaxEngine()
@@ -31,7 +58,7 @@ def test_tax_engine():
     
     print("\n=== Tax Advice ===")
     tax_advice_dict = tax_advice.to_dict()
-    print(json.dumps(tax_advice_dict, indent=2))
+    pj(tax_advice_dict)
 
 if __name__ == "__main__":
     test_tax_engine()
@@ -1,5 +1,5 @@
-import json
 from tax_engine import TaxEngine, ServiceCategory, TaxJurisdiction
+from json_output import pj
 
 def test_international_scenarios():
     tax_engine = TaxEngine()
@@ -48,26 +48,20 @@ def test_international_scenarios():
         }
     ]
     
-    for scenario in scenarios:
-        print(f"\n=== {scenario['name']} ===")
-        print(f"Details:")
-        print(f"- Payer Country: {scenario['payer_country']}")
-        print(f"- Vendor Country: {scenario['vendor_country']}")
-        print(f"- Service Type: {scenario['service_type']}")
-        print(f"- Value: {scenario['value']} {scenario['currency']}")
-        
-        tax_advice = tax_engine.get_tax_advice(
-            payer_country=scenario['payer_country'],
-            vendor_country=scenario['vendor_country'],
-            service_type=scenario['service_type'],
-            transaction_value=scenario['value'],
-            currency=scenario['currency'],
-            has_permanent_establishment=False,
-            tax_residency_certificate=True
-        )
-        
-        print("\nTax Analysis Results:")
-        print(json.dumps(tax_advice.to_dict(), indent=2))
+    results = tax_engine.get_tax_advice_batch([
+        {**scenario, "has_permanent_establishment": False, "tax_residency_certificate": True}
+        for scenario in scenarios
+    ])
+    
+    # Serialize every scenario's details and results as one document, written once
+    pj([
+        {
+            "scenario": scenario["name"],
+            "details": {key: value for key, value in scenario.items() if key != "name"},
+            "advice": tax_advice.to_dict()
+        }
+        for scenario, tax_advice in zip(scenarios, results)
+    ])
 
 if __name__ == "__main__":
     test_international_scenarios()
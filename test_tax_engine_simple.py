@@ -1,51 +1,56 @@
-import json
 from tax_engine import TaxEngine, ServiceCategory, TaxJurisdiction
+from json_output import pj
+
+# Each case: heading lines printed before the results, plus get_tax_advice arguments
+CASES = [
+    {
+        "title": "Test Case 1: Domestic Indian Transaction",
+        "details": [
+            "Scenario: Printing services between two Indian entities",
+            "Invoice Details:",
+            "- Service: Printing",
+            "- Value: ₹11,000.00",
+            "- CGST: ₹990.00 (9%)",
+            "- SGST: ₹990.00 (9%)",
+        ],
+        "payer_country": "India",
+        "vendor_country": "India",
+        "service_type": ServiceCategory.PRINTING.value,
+        "transaction_value": 11000.0,
+        "currency": "INR",
+        "has_permanent_establishment": True,
+        "tax_residency_certificate": True
+    },
+    {
+        "title": "Test Case 2: Cross-Border Transaction",
+        "details": [
+            "Scenario: Technical services provided by US entity to Indian entity",
+            "Invoice Details:",
+            "- Service: Technical Services",
+            "- Value: $10,000.00",
+        ],
+        "payer_country": "India",
+        "vendor_country": "United States",
+        "service_type": ServiceCategory.TECHNICAL.value,
+        "transaction_value": 10000.0,
+        "currency": "USD",
+        "has_permanent_establishment": False,
+        "tax_residency_certificate": True
+    },
+]
 
 def test_tax_engine():
     # Initialize tax engine
     tax_engine = TaxEngine()
     
-    # Test case 1: Domestic Indian transaction (Printing Services)
-    print("\n=== Test Case 1: Domestic Indian Transaction ===")
-    print("Scenario: Printing services between two Indian entities")
-    print("Invoice Details:")
-    print("- Service: Printing")
-    print("- Value: ₹11,000.00")
-    print("- CGST: ₹990.00 (9%)")
-    print("- SGST: ₹990.00 (9%)")
-    
-    tax_advice = tax_engine.get_tax_advice(
-        payer_country="India",
-        vendor_country="India",
-        service_type=ServiceCategory.PRINTING.value,
-        transaction_value=11000.0,
-        currency="INR",
-        has_permanent_establishment=True,
-        tax_residency_certificate=True
-    )
-    
-    print("\nTax Analysis Results:")
-    print(json.dumps(tax_advice.to_dict(), indent=2))
-    
-    # Test case 2: Cross-border transaction (US-India)
-    print("\n=== Test Case 2: Cross-Border Transaction ===")
-    print("Scenario: Technical services provided by US entity to Indian entity")
-    print("Invoice Details:")
-    print("- Service: Technical Services")
-    print("- Value: $10,000.00")
-    
-    tax_advice = tax_engine.get_tax_advice(
-        payer_country="India",
-        vendor_country="United States",
-        service_type=ServiceCategory.TECHNICAL.value,
-        transaction_value=10000.0,
-        currency="USD",
-        has_permanent_establishment=False,
-        tax_residency_certificate=True
-    )
-    
-    print("\nTax Analysis Results:")
-    print(json.dumps(tax_advice.to_dict(), indent=2))
+    results = tax_engine.get_tax_advice_batch(CASES)
+    for case, tax_advice in zip(CASES, results):
+        print(f"\n=== {case['title']} ===")
+        for line in case["details"]:
+            print(line)
+        
+        print("\nTax Analysis Results:")
+        pj(tax_advice.to_dict())
 
 if __name__ == "__main__":
     test_tax_engine()
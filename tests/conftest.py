@@ -0,0 +1,9 @@
+import pytest
+from pytest_asyncio import is_async_test
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on one session-wide event loop instead of a loop per test"""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
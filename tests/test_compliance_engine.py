@@ -1,39 +1,40 @@
-import unittest
+import pytest
 from datetime import datetime, timedelta
 from compliance_engine import ComplianceEngine
 
-class TestComplianceEngine(unittest.TestCase):
-    def setUp(self):
-        self.compliance_engine = ComplianceEngine()
+# Fixed clock so due dates don't depend on when the suite runs
+FIXED_NOW = datetime(2025, 3, 20, 12, 0, 0)
 
-    def test_generate_compliance_checklist(self):
-        tax_data = {
-            "country": "Singapore",
-            "transaction_type": "Service",
-            "amount": 100000,
-            "date": datetime.now()
-        }
-        checklist = self.compliance_engine.generate_checklist(tax_data)
-        self.assertIsNotNone(checklist)
-        self.assertTrue(any(item for item in checklist if "GST registration" in item["action"]))
-        self.assertTrue(any(item for item in checklist if "IRAS filing" in item["action"]))
+@pytest.fixture(scope="module")
+def compliance_engine():
+    """Engine shared by the module; tests don't mutate it"""
+    return ComplianceEngine()
 
-    def test_calculate_due_dates(self):
-        filing_type = "GST"
-        transaction_date = datetime.now()
-        due_date = self.compliance_engine.calculate_due_date(filing_type, transaction_date)
-        self.assertIsInstance(due_date, datetime)
-        self.assertTrue(due_date > transaction_date)
+def test_generate_compliance_checklist(compliance_engine):
+    tax_data = {
+        "country": "Singapore",
+        "transaction_type": "Service",
+        "amount": 100000,
+        "date": FIXED_NOW
+    }
+    checklist = compliance_engine.generate_checklist(tax_data)
+    assert checklist is not None
+    # One pass over the checklist, then plain substring checks
+    actions_text = " | ".join(item["action"] for item in checklist)
+    assert "GST registration" in actions_text
+    assert "IRAS filing" in actions_text
 
-    def test_validate_compliance_requirements(self):
-        requirements = {
-            "tax_registration": True,
-            "valid_tax_id": "T12345678",
-            "filing_history": ["2023Q1", "2023Q2"]
-        }
-        validation = self.compliance_engine.validate_requirements(requirements)
-        self.assertTrue(validation["is_compliant"])
-        self.assertEqual(len(validation["missing_requirements"]), 0)
+def test_calculate_due_dates(compliance_engine):
+    due_date = compliance_engine.calculate_due_date("GST", FIXED_NOW)
+    assert isinstance(due_date, datetime)
+    assert due_date > FIXED_NOW
 
-if __name__ == '__main__':
-    unittest.main()
+def test_validate_compliance_requirements(compliance_engine):
+    requirements = {
+        "tax_registration": True,
+        "valid_tax_id": "T12345678",
+        "filing_history": ["2023Q1", "2023Q2"]
+    }
+    validation = compliance_engine.validate_requirements(requirements)
+    assert validation["is_compliant"]
+    assert len(validation["missing_requirements"]) == 0
@@ -1,7 +1,8 @@
 import pytest
 import aiohttp
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 from integration.erp_connector import (
     ERPTransaction, NetSuiteConnector, ERPReconciliationService
 )
@@ -17,23 +18,44 @@ from integration.gov_portal import (
     SubmissionResult, GSTNPortal, IRSPortal, HMRCPortal,
     FilingOrchestrator
 )
+from tax_engine import TaxEngine
 
-@pytest.fixture
+@dataclass(frozen=True)
+class TaxAdviceStub:
+    """Tax advice fields read by PaymentTaxValidator"""
+    withholding_required: bool
+    withholding_rate: float
+    indirect_tax_required: bool
+    indirect_tax_type: str
+    indirect_tax_rate: float
+
+# These tests share module-scoped mocks and one event loop, so keep them on one xdist worker
+pytestmark = pytest.mark.xdist_group("integrations")
+
+@pytest.fixture(scope="module")
 def mock_session():
     """Mock aiohttp ClientSession"""
-    session = Mock()
-    session.__aenter__ = Mock()
-    session.__aexit__ = Mock()
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    # aiohttp request methods return an async context manager without being awaited
+    session.get = MagicMock()
+    session.post = MagicMock()
     return session
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_response():
     """Mock aiohttp response"""
-    response = Mock()
-    response.__aenter__ = Mock()
-    response.__aexit__ = Mock()
+    response = AsyncMock()
+    response.__aenter__.return_value = response
     return response
 
+@pytest.fixture(autouse=True)
+def reset_http_mocks(mock_session, mock_response):
+    """Clear calls recorded by the shared session and response mocks"""
+    yield
+    mock_session.reset_mock()
+    mock_response.reset_mock()
+
 @pytest.fixture
 def sample_erp_transaction():
     """Sample ERP transaction data"""
@@ -71,7 +93,6 @@ def sample_payment_transaction():
     )
 
 class TestERPIntegration:
-    @pytest.mark.asyncio
     async def test_fetch_ledger_entries(self, mock_session, mock_response):
         """Test fetching ledger entries from NetSuite"""
         # Mock response data
@@ -87,7 +108,6 @@ class TestERPIntegration:
                 "status": "Paid"
             }]
         }
-        mock_session.__aenter__.return_value = mock_session
         mock_session.get.return_value = mock_response
 
         connector = NetSuiteConnector("test_key", "http://test.com")
@@ -100,7 +120,6 @@ class TestERPIntegration:
         assert entries[0].amount == 1000.0
         assert entries[0].vendor_name == "Test Vendor"
 
-    @pytest.mark.asyncio
     async def test_validate_tax_entries(self, mock_session, mock_response, sample_erp_transaction):
         """Test tax entry validation"""
         # Mock tax data response
@@ -110,7 +129,6 @@ class TestERPIntegration:
                 "taxAmount": 100.0
             }]
         }
-        mock_session.__aenter__.return_value = mock_session
         mock_session.get.return_value = mock_response
 
         connector = NetSuiteConnector("test_key", "http://test.com")
@@ -123,7 +141,6 @@ class TestERPIntegration:
         assert validation["actual_taxes"]["withholding"] == 100.0
 
 class TestPaymentGateway:
-    @pytest.mark.asyncio
     async def test_fetch_stripe_payouts(self, mock_session, mock_response):
         """Test fetching payouts from Stripe"""
         # Mock Stripe response
@@ -142,7 +159,6 @@ class TestPaymentGateway:
                 "metadata": {}
             }]
         }
-        mock_session.__aenter__.return_value = mock_session
         mock_session.get.return_value = mock_response
 
         connector = StripeConnector("test_key", "http://test.com")
@@ -155,12 +171,11 @@ class TestPaymentGateway:
         assert payouts[0].amount == 1000.00  # Converted from cents
         assert payouts[0].currency == "USD"
 
-    @pytest.mark.asyncio
     async def test_payment_tax_validation(self, sample_payment_transaction):
         """Test payment tax validation"""
         # Mock tax engine
-        mock_tax_engine = Mock()
-        mock_tax_engine.get_tax_advice.return_value = Mock(
+        mock_tax_engine = Mock(spec=TaxEngine)
+        mock_tax_engine.get_tax_advice.return_value = TaxAdviceStub(
             withholding_required=True,
             withholding_rate=0.1,
             indirect_tax_required=True,
@@ -176,7 +191,6 @@ class TestPaymentGateway:
         assert flags[1].flag_type == "MISSING_INDIRECT_TAX"
 
 class TestDocumentManagement:
-    @pytest.mark.asyncio
     async def test_fetch_documents(self, mock_session, mock_response):
         """Test fetching documents from Google Drive"""
         # Mock Drive response
@@ -195,7 +209,6 @@ class TestDocumentManagement:
                 }
             }]
         }
-        mock_session.__aenter__.return_value = mock_session
         mock_session.get.return_value = mock_response
 
         manager = GoogleDriveManager("test_key", "http://test.com")
@@ -209,7 +222,6 @@ class TestDocumentManagement:
         assert docs[0].vendor_id == "V456"
 
 class TestGovernmentPortals:
-    @pytest.mark.asyncio
     async def test_gstn_submission(self, mock_session, mock_response):
         """Test GSTN portal submission"""
         # Mock GSTN response
@@ -218,7 +230,6 @@ class TestGovernmentPortals:
             "ack_num": "ACK456",
             "status": "SUBMITTED"
         }
-        mock_session.__aenter__.return_value = mock_session
         mock_session.post.return_value = mock_response
 
         portal = GSTNPortal("test_key", "test_secret", "http://test.com")
@@ -231,11 +242,8 @@ class TestGovernmentPortals:
         assert result.acknowledgment_number == "ACK456"
         assert result.status == "SUBMITTED"
 
-    @pytest.mark.asyncio
     async def test_filing_orchestrator(self):
         """Test filing orchestrator with multiple portals"""
-        orchestrator = FilingOrchestrator()
-        
         # Mock portals
         mock_gstn = Mock()
         mock_gstn.submit_filing.return_value = SubmissionResult(
@@ -248,10 +256,26 @@ class TestGovernmentPortals:
             raw_response={}
         )
         
-        orchestrator.register_portal("INDIA", mock_gstn)
+        orchestrator = FilingOrchestrator(portals={"INDIA": mock_gstn})
         
         result = await orchestrator.submit_filing("INDIA", {"test": "data"})
         
         assert result.portal == "GSTN"
         assert result.status == "SUBMITTED"
         assert result.submission_id == "GST123"
+
+    def test_register_portals_routes_filing(self):
+        """Test bulk registration on an existing orchestrator, including overriding a portal"""
+        old_gstn, new_gstn, irs = Mock(), Mock(), Mock()
+        new_gstn.submit_filing.return_value = "GST_RESULT"
+        irs.submit_filing.return_value = "IRS_RESULT"
+
+        orchestrator = FilingOrchestrator()
+        orchestrator.register_portal("INDIA", old_gstn)
+        orchestrator.register_portals({"INDIA": new_gstn, "USA": irs})
+
+        assert orchestrator.submit_filing("INDIA", {"gstin": "X"}) == "GST_RESULT"
+        assert orchestrator.submit_filing("USA", {"ein": "Y"}) == "IRS_RESULT"
+        new_gstn.submit_filing.assert_called_once_with({"gstin": "X"})
+        irs.submit_filing.assert_called_once_with({"ein": "Y"})
+        old_gstn.submit_filing.assert_not_called()
@@ -0,0 +1,28 @@
+import pytest
+from service_classifier import get_classifier
+
+@pytest.fixture(scope="module")
+def classifier():
+    """Process-wide classifier; tests don't mutate it"""
+    return get_classifier()
+
+@pytest.mark.parametrize("text, expected", [
+    ("Total Amount: , 1,000", 1000.0),
+    ("item 12, total value , 99.50", 99.5),
+    ("Grand Total , : Rs. , 2,500.00", 2500.0),
+    ("Amount payable ,: $ 3,000", 3000.0),
+])
+def test_amount_skips_stray_commas_after_label(classifier, text, expected):
+    _, amount = classifier._extract_currency_and_amount(text)
+    assert amount == expected
+
+def test_amount_keeps_thousands_separators(classifier):
+    currency, amount = classifier._extract_currency_and_amount("Total Amount: Rs. 1,20,000.00")
+    assert amount == 120000.0
+    assert currency.code == "INR"
+
+@pytest.mark.parametrize("gap", [" ", " ,"])
+def test_amount_scan_is_linear_on_long_blank_runs(classifier, gap):
+    # A long blank run after a label used to backtrack without bound
+    _, amount = classifier._extract_currency_and_amount("total" + gap * 20000 + "x")
+    assert amount == 0.0
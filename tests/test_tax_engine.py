@@ -0,0 +1,103 @@
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import FrozenInstanceError
+from tax_engine import TaxEngine, TaxType
+
+@pytest.fixture(scope="module")
+def engine():
+    """Engine shared by the module; tests don't mutate it"""
+    return TaxEngine()
+
+def test_currency_does_not_leak_between_calls(engine):
+    eur_advice = engine.get_tax_advice(
+        "Singapore", "France", "Technical Services", 10000, currency="EUR"
+    )
+    usd_advice = engine.get_tax_advice(
+        "Singapore", "France", "Technical Services", 10000, currency="USD"
+    )
+    assert eur_advice.applicable_taxes[TaxType.GST].currency == "EUR"
+    assert usd_advice.applicable_taxes[TaxType.GST].currency == "USD"
+
+def test_rate_table_is_immutable(engine):
+    advice = engine.get_tax_advice("India", "United States", "Consulting", 10000)
+    with pytest.raises(FrozenInstanceError):
+        advice.applicable_taxes[TaxType.GST].currency = "INR"
+
+def test_cached_advice_is_not_shared(engine):
+    first = engine.get_tax_advice("India", "United States", "Consulting", 10000)
+    first.compliance_notes.append("edited by caller")
+    first.applicable_taxes.clear()
+    second = engine.get_tax_advice("India", "United States", "Consulting", 10000)
+    assert "edited by caller" not in second.compliance_notes
+    assert TaxType.GST in second.applicable_taxes
+
+@pytest.mark.parametrize("country", [None, 42])
+def test_non_string_country_raises_value_error(engine, country):
+    with pytest.raises(ValueError):
+        engine.get_tax_advice(country, "India", "Consulting", 10000)
+
+def test_to_json_matches_to_dict(engine):
+    advice = engine.get_tax_advice(
+        "India", "United States", "Technical Services", 10000, currency="INR"
+    )
+    assert json.loads(advice.to_json()) == advice.to_dict()
+
+def test_rate_tables_are_shared_between_engines(engine):
+    other = TaxEngine()
+    assert other.tax_rates is engine.tax_rates
+    assert other.tax_treaties is engine.tax_treaties
+
+def test_advice_cache_is_shared_between_engines(engine):
+    advice = engine.get_tax_advice("Germany", "France", "Consulting", 10000)
+    hits = TaxEngine._cached_advice.cache_info().hits
+    assert TaxEngine().get_tax_advice("Germany", "France", "Consulting", 500).to_dict() == advice.to_dict()
+    assert TaxEngine._cached_advice.cache_info().hits == hits + 1
+
+def test_batch_advice_matches_single_calls(engine):
+    scenarios = [
+        {"payer_country": "India", "vendor_country": "United States",
+         "service_type": "Technical Services", "currency": "INR", "tax_residency_certificate": True},
+        {"payer_country": "Germany", "vendor_country": "France", "service_type": "Consulting"},
+        {"payer_country": "India", "vendor_country": "United States",
+         "service_type": "Technical Services", "currency": "INR", "tax_residency_certificate": True},
+    ]
+    batch = engine.get_tax_advice_batch(scenarios)
+    assert len(batch) == len(scenarios)
+    for scenario, advice in zip(scenarios, batch):
+        single = engine.get_tax_advice(transaction_value=0, **scenario)
+        assert advice.to_dict() == single.to_dict()
+    assert batch[0].compliance_notes is not batch[2].compliance_notes
+
+def test_concurrent_advice_matches_serial(engine):
+    scenarios = [
+        ("India", "United States", "Technical Services", "INR"),
+        ("Germany", "France", "Consulting", "EUR"),
+        ("Singapore", "France", "Technical Services", "EUR"),
+        ("United Kingdom", "India", "Royalty/License", "GBP"),
+    ] * 8
+
+    # Every thread uses the shared engine, so they race on the same advice cache
+    def run_one(scenario):
+        payer, vendor, service, currency = scenario
+        return engine.get_tax_advice(payer, vendor, service, 10000, currency=currency).to_dict()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        concurrent = list(executor.map(run_one, scenarios))
+    serial = [run_one(scenario) for scenario in scenarios]
+    assert concurrent == serial
+
+def test_bulk_analysis_matches_single_transactions(engine):
+    transactions = [
+        ("India", "Singapore", "Digital Services", 12345.5),
+        ("Singapore", "India", "Technical Services", 1000.0),
+        ("France", "India", "Consulting", 500.0),
+        ("India", "Singapore", "Technical Services", 0.25),
+    ]
+    bulk = engine.analyze_transactions_bulk(*zip(*transactions))
+    for row, transaction in enumerate(transactions):
+        single = engine.analyze_transaction(*transaction)
+        assert bulk["total_tax_amount"][row] == single["total_tax_amount"]
+        mask = bulk["row"] == row
+        assert list(bulk["type"][mask]) == [tax["type"] for tax in single["applicable_taxes"]]
+        assert list(bulk["amount"][mask]) == [tax["amount"] for tax in single["applicable_taxes"]]